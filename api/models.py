@@ -1,5 +1,5 @@
 from datetime import date as dt_date
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 # --- Request Validation Model ---
 class PredictionRequest(BaseModel):
@@ -10,6 +10,12 @@ class PredictionRequest(BaseModel):
     symbol: str = Field(..., description="Stock ticker symbol, e.g., 'AAPL'.")
     date: dt_date = Field(..., description="Date for prediction in 'YYYY-MM-DD' format.")
 
+    @field_validator('symbol', mode='before')
+    @classmethod
+    def standardize_symbol(cls, value):
+        """Upper-case the symbol once at validation time so handlers never mutate the model."""
+        return value.upper() if isinstance(value, str) else value
+
 # --- Response Model ---
 class PredictionResponse(BaseModel):
     """
@@ -19,4 +25,27 @@ class PredictionResponse(BaseModel):
     symbol: str = Field(..., description="Stock ticker symbol.")
     date: dt_date = Field(..., description="Date of prediction.")
     prediction: bool = Field(..., description="The predicted outcome (True/False).")
-    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence level of the prediction.")
\ No newline at end of file
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence level of the prediction.")
+
+# --- Batch Request Validation Model ---
+class PredictionBatchRequest(BaseModel):
+    """
+    Model for the POST /predict_batch request body.
+    Ensures 'symbols' is a non-empty list of up to 100 tickers and 'date' is a valid YYYY-MM-DD date.
+    """
+    symbols: list[str] = Field(..., min_length=1, max_length=100, description="Stock ticker symbols, e.g., ['AAPL', 'MSFT'].")
+    date: dt_date = Field(..., description="Date for prediction in 'YYYY-MM-DD' format.")
+
+    @field_validator('symbols', mode='after')
+    @classmethod
+    def standardize_symbols(cls, value: list[str]) -> list[str]:
+        """Upper-case the symbols and drop duplicates, keeping the request order."""
+        return list(dict.fromkeys(symbol.upper() for symbol in value))
+
+# --- Batch Response Model ---
+class PredictionBatchResponse(BaseModel):
+    """
+    Model for the POST /predict_batch response body.
+    """
+    predictions: list[PredictionResponse] = Field(..., description="One prediction per symbol that has market data.")
+    not_found: list[str] = Field(..., description="Requested symbols with no market data for the date range.")
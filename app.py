@@ -1,22 +1,29 @@
 import logging
 import os
-from flask_pydantic import validate
-from flask import Flask, jsonify
+import orjson
+from flask import Flask, Response, request
+from flask_orjson import OrjsonProvider
 from pydantic import ValidationError
 from werkzeug.exceptions import HTTPException
 from asgiref.wsgi import WsgiToAsgi
 
-from api.models import PredictionRequest, PredictionResponse
+from api.models import PredictionBatchRequest, PredictionBatchResponse, PredictionRequest, PredictionResponse
 from outward_services.exceptions import TickerNotFoundError
 from services.prediction_service import PredictionService
 from util.logger import setup_logging
 
 app = Flask(__name__)
+# Back Flask's JSON provider (get_json, jsonify) with orjson; numpy scalars serialize natively.
+app.json = OrjsonProvider(app)
+app.json.option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
 # Wrap the Flask app with ASGI middleware
 asgi_app = WsgiToAsgi(app)
 
 logger = setup_logging(logging.INFO)
 
+# Built once per process so the Yahoo client and its HTTP session are reused across requests.
+prediction_service = PredictionService()
+
 class PredictionError(Exception):
     """Custom exception for application-specific errors."""
     def __init__(self, message, status_code=500):
@@ -25,53 +32,83 @@ class PredictionError(Exception):
         self.status_code = status_code
 
  # --- Global Error Handler ---
+def _json(payload: dict, status: int) -> Response:
+    """Serialize an error payload straight to bytes with orjson."""
+    return app.response_class(orjson.dumps(payload), status=status, mimetype='application/json')
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     """General error handler for unhandled exceptions."""
     # Let Werkzeug/Flask HTTP errors keep their intended status codes
     if isinstance(e, HTTPException):
-        return jsonify({"error": e.name, "message": e.description}), e.code
+        return _json({"error": e.name, "message": e.description}, e.code)
 
     if isinstance(e, PredictionError):
-        logger.error(f"Prediction Error: {e.message} (Status: {e.status_code})")
-        return jsonify({"error": e.message}), e.status_code
+        logger.error("Prediction Error: %s (Status: %s)", e.message, e.status_code)
+        return _json({"error": e.message}, e.status_code)
     if isinstance(e, ValidationError):
          error_details = [{"loc": err["loc"], "msg": err["msg"]} for err in e.errors()]
-         logger.warning(f"Validation Error: {error_details}")
-         return jsonify({"error": "Invalid request body", "details": error_details}), 400
+         logger.warning("Validation Error: %s", error_details)
+         return _json({"error": "Invalid request body", "details": error_details}, 400)
 
     if isinstance(e, TickerNotFoundError):
-        logger.warning(f"Invalid ticker symbol: {e.symbol}")
-        return jsonify({
+        logger.warning("Invalid ticker symbol: %s", e.symbol)
+        return _json({
             "error": "Invalid ticker symbol",
             "message": str(e),
             "symbol": e.symbol
-        }), 400
+        }, 400)
 
     logger.exception("An unexpected error occurred.")
-    return jsonify({"error": "An unexpected server error occurred."}), 500
+    return _json({"error": "An unexpected server error occurred."}, 500)
 
 @app.route('/predict', methods=['POST'])
-@validate()
-def predict(body: PredictionRequest) -> PredictionResponse:
+def predict() -> Response:
     """
     POST endpoint to get a stock prediction.
 
-    :param body: The validated PredictionRequest object containing symbol and date.
+    The body is parsed and validated as a PredictionRequest in a single pydantic-core pass;
+    a ValidationError is turned into a 400 response by the global error handler.
+
     :return: A JSON response conforming to the PredictionResponse model.
     """
-    prediction_service = PredictionService()
-    body.symbol = body.symbol.upper() # Standardize symbol
-    date_str = body.date.strftime('%Y-%m-%d')
-    logger.info(f"Received prediction request for symbol: {body.symbol} on date: {date_str}")
+    body = PredictionRequest.model_validate_json(request.get_data(cache=False))
+    # Lazy %-style arguments: nothing is formatted unless INFO is enabled (a date formats as YYYY-MM-DD).
+    logger.info("Received prediction request for symbol: %s on date: %s", body.symbol, body.date)
     forecast_result= prediction_service.predict(body.symbol, body.date)
-    prediction_response = PredictionResponse(
+    # Fields come from the validated request and the service's bounded confidence, so skip re-validation.
+    prediction_response = PredictionResponse.model_construct(
         symbol=body.symbol,
         date=body.date,
         prediction=forecast_result.prediction,
         confidence=forecast_result.confidence)
-    logger.info(f"Successfully processed request for {body.symbol}. Confidence: {prediction_response.confidence}")
-    return prediction_response
+    logger.info("Successfully processed request for %s. Confidence: %s", body.symbol, prediction_response.confidence)
+    # Serialize in pydantic-core in a single pass, without building an intermediate dict.
+    return app.response_class(prediction_response.model_dump_json(), mimetype='application/json')
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch() -> Response:
+    """
+    POST endpoint to get stock predictions for several symbols at once.
+    Market data is fetched in bulk, so this is cheaper than one /predict call per symbol.
+
+    :return: A JSON response conforming to the PredictionBatchResponse model.
+    """
+    body = PredictionBatchRequest.model_validate_json(request.get_data(cache=False))
+    logger.info("Received batch prediction request for %d symbols on date: %s", len(body.symbols), body.date)
+    forecast_results = prediction_service.predict_many(body.symbols, body.date)
+    batch_response = PredictionBatchResponse.model_construct(
+        predictions=[
+            PredictionResponse.model_construct(
+                symbol=symbol,
+                date=body.date,
+                prediction=forecast_result.prediction,
+                confidence=forecast_result.confidence)
+            for symbol, forecast_result in forecast_results.items()
+        ],
+        not_found=[symbol for symbol in body.symbols if symbol not in forecast_results])
+    logger.info("Successfully processed batch request. Predicted %d of %d symbols.", len(forecast_results), len(body.symbols))
+    return app.response_class(batch_response.model_dump_json(), mimetype='application/json')
 
 if __name__ == '__main__':
     debug = os.getenv("FLASK_DEBUG", "0") == "1"
@@ -81,11 +118,14 @@ if __name__ == '__main__':
     if debug:
         app.run(debug=True, host=host, port=port)
     else:
-        # In production mode, use Uvicorn
+        # In production mode, use Uvicorn. WsgiToAsgi runs Flask on a single thread per process,
+        # so requests blocked on Yahoo are only served concurrently across worker processes.
         import uvicorn
+        workers = int(os.getenv("WEB_CONCURRENCY", str((os.cpu_count() or 1) * 2)))
         uvicorn.run(
-            asgi_app,
+            "app:asgi_app",
             host=host,
             port=port,
+            workers=workers,
             log_level="info"
         )
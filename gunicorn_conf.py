@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for serving the Flask app in production (Linux/macOS):
+
+    gunicorn -c gunicorn_conf.py app:app
+
+The app is imported once in the master before forking, so the compiled Numba kernels, the shared
+Yahoo Finance client and its HTTP session are created once and shared copy-on-write by the workers.
+"""
+import os
+
+from util.logger import restart_listener
+
+bind = f"{os.getenv('HOST', '127.0.0.1')}:{os.getenv('PORT', '5000')}"
+preload_app = True
+workers = int(os.getenv("WEB_CONCURRENCY", str((os.cpu_count() or 1) * 2 + 1)))
+# Requests mostly wait on Yahoo, so each worker serves several at once from its own threads.
+# curl_cffi keeps a connection cache per thread, so the number of Yahoo connections per worker
+# follows `threads` plus the client's executor without a separate pool size to tune.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+def post_fork(server, worker):
+    # The logging listener thread started while preloading the app does not survive fork.
+    restart_listener()
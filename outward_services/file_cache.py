@@ -0,0 +1,171 @@
+"""Persistent OHLCV cache so repeated ticker/date-range requests skip the Yahoo Finance round-trip."""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+@dataclass
+class _CachedFrame:
+    data: pd.DataFrame
+    covered_start: date  # inclusive
+    covered_end: date  # exclusive, like yfinance's `end`
+    fetched_at: float
+
+
+class FileCache:
+    """
+    One parquet file per ticker and interval, holding one contiguous date range of rows together with
+    the range it covers. Warm ranges are served from disk (or from memory after the first read), a
+    range that extends past the cached one only downloads the missing tail, and an overlapping range
+    is merged in. A range that does not touch the cached one replaces it.
+
+    At most `max_frames` tickers are kept in memory, the least recently stored going first; evicted
+    tickers are read back from disk on their next request.
+
+    The row for the day a range was fetched on may be a partial, mid-session bar, so once the entry is
+    older than `today_ttl` seconds its coverage is treated as ending before that day, and that day's
+    row is fetched again (also after midnight, so a partial bar is never kept as final).
+    """
+
+    def __init__(self, cache_dir: str | Path, interval: str = "1d", today_ttl: float = 60.0, max_frames: int = 256):
+        self.cache_dir = Path(cache_dir)
+        self.interval = interval
+        self.today_ttl = today_ttl
+        self.max_frames = max_frames
+        self._frames: dict[str, _CachedFrame] = {}
+        self._frames_guard = threading.Lock()
+        self._locks: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+
+    def get_or_fetch(self, ticker: str, start_date: str, end_date: str,
+                     fetch: Callable[[str, str], pd.DataFrame | None]) -> pd.DataFrame | None:
+        """
+        Returns the rows of `ticker` in [start_date, end_date), calling `fetch(start, end)` only for
+        the part of the range that is not cached yet.
+
+        :param ticker: The ticker symbol.
+        :param start_date: The start date in 'YYYY-MM-DD' format (inclusive).
+        :param end_date: The end date in 'YYYY-MM-DD' format (exclusive).
+        :param fetch: Downloads a date range; returns None or an empty frame when there is no data.
+        :return: The cached or freshly fetched rows, or whatever `fetch` returned when nothing is cached.
+        """
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        with self._lock_for(ticker):
+            cached = self._load(ticker)
+            if cached is not None and cached.covered_start <= start <= self._fresh_end(cached):
+                fresh_end = self._fresh_end(cached)
+                if end <= fresh_end:
+                    return self._slice(cached.data, start, end)
+                # Contiguous with the cached range: only the missing tail goes over the network.
+                missing = fetch(fresh_end.isoformat(), end_date)
+                if missing is None or missing.empty:
+                    # A closed range without rows is a non-trading stretch (a weekend or holiday), so it is
+                    # recorded as covered; a range reaching today may just not have today's bar yet.
+                    if end <= date.today():
+                        self._store(ticker, _CachedFrame(cached.data, cached.covered_start, end, time.time()))
+                    return self._slice(cached.data, start, end)
+                data = self._merge(cached.data, missing)
+                # Rows from `end` on may be stale partial bars, so coverage stops at what was just fetched.
+                self._store(ticker, _CachedFrame(data, cached.covered_start, end, time.time()))
+                return self._slice(data, start, end)
+
+            fetched = fetch(start_date, end_date)
+            if fetched is None or fetched.empty:
+                return fetched
+            if cached is not None and start <= cached.covered_end and cached.covered_start <= end:
+                # Overlapping ranges are merged so earlier history is kept.
+                # Cached rows past their fresh end may be partial bars, so they are not counted as covered.
+                entry = _CachedFrame(self._merge(cached.data, fetched), min(start, cached.covered_start),
+                                     max(end, self._fresh_end(cached)), time.time())
+            else:
+                entry = _CachedFrame(fetched, start, end, time.time())
+            self._store(ticker, entry)
+            return fetched
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks[ticker]
+
+    def _path(self, ticker: str) -> Path:
+        return self.cache_dir / f"{ticker}_{self.interval}.parquet"
+
+    def _fresh_end(self, cached: _CachedFrame) -> date:
+        fetched_on = date.fromtimestamp(cached.fetched_at)
+        if cached.covered_end > fetched_on and time.time() - cached.fetched_at > self.today_ttl:
+            return fetched_on
+        return cached.covered_end
+
+    def _load(self, ticker: str) -> _CachedFrame | None:
+        cached = self._frames.get(ticker)
+        if cached is not None:
+            return cached
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+        try:
+            # Memory-map the file and release each Arrow column as soon as it is converted, so loading
+            # a ticker's history never holds both the Arrow and the pandas copy of it at once.
+            data = pq.read_table(path, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+            attrs = data.attrs
+            cached = _CachedFrame(data, date.fromisoformat(attrs["covered_start"]),
+                                  date.fromisoformat(attrs["covered_end"]), float(attrs["fetched_at"]))
+        except Exception as e:
+            logging.warning("Ignoring unreadable OHLCV cache file %s: %s", path, e)
+            return None
+        self._remember(ticker, cached)
+        return cached
+
+    def _remember(self, ticker: str, entry: _CachedFrame) -> None:
+        with self._frames_guard:
+            self._frames.pop(ticker, None)
+            if len(self._frames) >= self.max_frames:
+                # Dicts keep insertion order, so the first key is the least recently stored entry.
+                del self._frames[next(iter(self._frames))]
+            self._frames[ticker] = entry
+
+    def _store(self, ticker: str, entry: _CachedFrame) -> None:
+        self._remember(ticker, entry)
+        data = entry.data.copy(deep=False)
+        data.attrs = {
+            "covered_start": entry.covered_start.isoformat(),
+            "covered_end": entry.covered_end.isoformat(),
+            "fetched_at": entry.fetched_at,
+        }
+        path = self._path(ticker)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            data.to_parquet(tmp_path, compression="zstd")
+            # Atomic rename so concurrent readers never see a half-written file.
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # The in-memory entry still serves this process; the disk copy is only an optimization.
+            logging.warning("Could not write OHLCV cache file %s: %s", path, e)
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _merge(cached: pd.DataFrame, fetched: pd.DataFrame) -> pd.DataFrame:
+        merged = pd.concat([cached, fetched])
+        # Filtering and sorting each copy the whole frame, so only do them when needed.
+        if merged.index.has_duplicates:
+            # Newly fetched rows (e.g. a refreshed intraday bar) win over cached ones.
+            merged = merged[~merged.index.duplicated(keep="last")]
+        if not merged.index.is_monotonic_increasing:
+            merged = merged.sort_index()
+        return merged
+
+    @staticmethod
+    def _slice(data: pd.DataFrame, start: date, end: date) -> pd.DataFrame:
+        tz = data.index.tz
+        lo = data.index.searchsorted(pd.Timestamp(start, tz=tz), side="left")
+        hi = data.index.searchsorted(pd.Timestamp(end, tz=tz), side="left")
+        return data.iloc[lo:hi]
@@ -1,31 +1,137 @@
 import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
 import yfinance as yf
 import pandas as pd
-from typing import Tuple
+from curl_cffi import requests as curl_requests
+from typing import Dict, List, Tuple
 
 from .exceptions import DataFetchError, TickerNotFoundError
+from .file_cache import FileCache
+
+# Shared by every client in the process so keep-alive connections to Yahoo outlive any single client.
+# curl_cffi gives each thread its own curl handle (and connection cache) on this session, which makes
+# it safe to use from the request threads and the client's executors at once.
+_SESSION = curl_requests.Session(impersonate="chrome")
+
+# The S&P 500 frame is identical for every symbol requested over the same range, so it is downloaded
+# once per process and shared by all requests. Entries whose range reaches the day they were fetched on
+# (whose last bar may be partial) expire after _SP500_TTL seconds; ranges that had already closed when
+# fetched never change. Callers must treat the frames as read-only.
+_SP500_TTL = 60.0
+_SP500_CACHE_SIZE = 64
+# (start_date, end_date) -> (time.monotonic() at fetch, date of fetch, frame)
+_SP500_CACHE: dict[tuple[str, str], tuple[float, date, pd.DataFrame]] = {}
+# Single-flight: concurrent misses wait for one download instead of all hitting Yahoo.
+_SP500_LOCK = threading.Lock()
+
+# Prices are stored as float32: the forecast needs far fewer digits than float64 carries, and it halves
+# the memory of cached frames. Volume is left as is, since index volumes overflow int32.
+_PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Adj Close')
+_PRICE_DTYPE = 'float32'
+
+# Shape of a Yahoo Finance symbol (e.g. 'AAPL', 'BRK-B', '7203.T', 'ES=F', '^DJI'). Anything else is
+# rejected before a request is made, so malformed input fails without a network round-trip.
+_TICKER_RE = re.compile(r'\^?[A-Z0-9][A-Z0-9.=\-]{0,14}')
 
 class YahooFinanceClient:
     def __init__(self):
         self.index_ticker = '^GSPC' # S&P 500 index
-        self.sp500_data = None
-        self.recent_sp500_day = None
+        self.session = _SESSION
+        # Lets the S&P 500 history call overlap with the ticker's instead of running after it.
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="yahoo-finance")
+        # Multi-symbol fetches fan out on their own pool, so a large batch never queues ahead of the
+        # S&P 500 fetch of a single-symbol request.
+        self.batch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="yahoo-finance-batch")
+        # Downloaded OHLCV rows are kept on disk so repeated date ranges skip the network.
+        self.file_cache = FileCache(os.getenv("YF_CACHE_DIR", ".cache/yfinance"))
     
-    # Robustly extract per-ticker frames regardless of yfinance/pandas layout
     @staticmethod
-    def _extract(df: pd.DataFrame, symbol: str) -> pd.DataFrame | None:
-        cols = df.columns
-        if isinstance(cols, pd.MultiIndex):
-            # Common case: ticker is level 0
-            if symbol in cols.get_level_values(0):
-                return df[symbol].copy()
-            # Fallback: some versions place ticker at level 1
-            if symbol in cols.get_level_values(1):
-                return df.xs(symbol, axis=1, level=1, drop_level=True).copy()
+    def _is_empty(df: pd.DataFrame | None) -> bool:
+        # Scans one column and stops at the first price instead of materializing a dropna() copy.
+        return df is None or len(df.index) == 0 or not df['Close'].notna().any()
+
+    @staticmethod
+    def _downcast_prices(df: pd.DataFrame | None) -> pd.DataFrame | None:
+        if df is None:
+            return None
+        columns = [col for col in _PRICE_COLUMNS if col in df.columns]
+        return df.astype(dict.fromkeys(columns, _PRICE_DTYPE)) if columns else df
+
+    @staticmethod
+    def _name_date_index(df: pd.DataFrame) -> pd.DataFrame:
+        # Ticker.history already names the index 'Date'; frames may be shared through the caches,
+        # so only write the name when it actually differs.
+        if df.index.name != 'Date':
+            df.index.name = 'Date'
+        return df
+
+    def _download(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame | None:
+        return self.file_cache.get_or_fetch(symbol, start_date, end_date, lambda start, end: self._download_from_yahoo(symbol, start, end))
+
+    def _download_from_yahoo(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame | None:
+        # Ticker.history returns a flat single-symbol frame, so no MultiIndex column handling is needed.
+        data = yf.Ticker(symbol, session=self.session).history(
+            start=start_date,
+            end=end_date,
+            auto_adjust=True,
+            actions=False
+        )
+        return YahooFinanceClient._downcast_prices(data)
+
+    def _download_or_none(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame | None:
+        # Ticker.history keeps a failed symbol's error on its own Ticker, so one bad symbol in a
+        # multi-symbol fetch is logged and skipped without touching yfinance's process-wide state.
+        try:
+            return self._download(symbol, start_date, end_date)
+        except Exception as e:
+            logging.warning("Could not fetch data for %s: %s", symbol, e)
+            return None
+
+    @staticmethod
+    def _sp500_cache_hit(key: tuple[str, str]) -> pd.DataFrame | None:
+        entry = _SP500_CACHE.get(key)
+        if entry is None:
+            return None
+        fetched_at, fetched_on, sp500_data = entry
+        if date.fromisoformat(key[1]) > fetched_on and time.monotonic() - fetched_at > _SP500_TTL:
             return None
-        # Single-ticker shape (defensive)
-        required = {"Open", "High", "Low", "Close", "Adj Close", "Volume"}
-        return df.copy() if required.issubset(set(map(str, cols))) else None
+        return sp500_data
+
+    def _fetch_sp500(self, start_date: str, end_date: str) -> pd.DataFrame:
+        key = (start_date, end_date)
+        sp500_data = self._sp500_cache_hit(key)
+        if sp500_data is not None:
+            return sp500_data
+        with _SP500_LOCK:
+            # Another request may have downloaded it while this one waited for the lock.
+            sp500_data = self._sp500_cache_hit(key)
+            if sp500_data is not None:
+                return sp500_data
+            sp500_data = self._download(self.index_ticker, start_date, end_date)
+            if YahooFinanceClient._is_empty(sp500_data):
+                logging.error("Could not fetch required S&P 500 index data (%s).", self.index_ticker)
+                raise DataFetchError(symbol=self.index_ticker)
+            YahooFinanceClient._name_date_index(sp500_data)
+            _SP500_CACHE.pop(key, None)
+            if len(_SP500_CACHE) >= _SP500_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest entry.
+                del _SP500_CACHE[next(iter(_SP500_CACHE))]
+            _SP500_CACHE[key] = (time.monotonic(), date.today(), sp500_data)
+            return sp500_data
+
+    def _submit_sp500(self, start_date: str, end_date: str) -> Future:
+        # A cached index is returned on the calling thread instead of waiting for a free executor thread.
+        sp500_data = self._sp500_cache_hit((start_date, end_date))
+        if sp500_data is None:
+            return self.executor.submit(self._fetch_sp500, start_date, end_date)
+        future = Future()
+        future.set_result(sp500_data)
+        return future
 
     def fetch_ohlcv_data(self, ticker_symbol: str, start_date: str, end_date: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -38,32 +144,51 @@ class YahooFinanceClient:
         :raises TickerNotFoundError: If the ticker symbol is not found or has no data.
         :raises DataFetchError: If there is a network error or an issue fetching S&P 500 data.
         """
+        if not _TICKER_RE.fullmatch(ticker_symbol.upper()):
+            logging.warning("Rejected malformed ticker symbol %r.", ticker_symbol)
+            raise TickerNotFoundError(symbol=ticker_symbol)
         try:
-            all_data = yf.download(
-                [ticker_symbol, self.index_ticker],
-                start=start_date,
-                end=end_date,
-                group_by='ticker',
-                progress=False  # Disable progress bar for cleaner logs
-            )
-            stock_data = YahooFinanceClient._extract(all_data, ticker_symbol)
-            if stock_data is None or stock_data.dropna(how='all').empty:
-                logging.warning(f"No data found for {ticker_symbol} in the specified date range.")
+            sp500_future = self._submit_sp500(start_date, end_date)
+            stock_data = self._download(ticker_symbol, start_date, end_date)
+            if YahooFinanceClient._is_empty(stock_data):
+                logging.warning("No data found for %s in the specified date range.", ticker_symbol)
                 raise TickerNotFoundError(symbol=ticker_symbol)
 
-            sp500_data = YahooFinanceClient._extract(all_data, self.index_ticker)
-            if sp500_data is None or sp500_data.dropna(how='all').empty:
-                logging.error(f"Could not fetch required S&P 500 index data ({self.index_ticker}).")
-                raise DataFetchError(symbol=self.index_ticker)
-
-            self.sp500_data = sp500_data
-            self.recent_sp500_day = sp500_data.index[-1]
-
-            stock_data.index.name = 'Date'
-            sp500_data.index.name = 'Date'
-            return sp500_data, stock_data
+            return sp500_future.result(), YahooFinanceClient._name_date_index(stock_data)
         except TickerNotFoundError:
             raise
         except Exception as e:            
-            logging.error(f"An unexpected error occurred while fetching data for {ticker_symbol}: {e}", exc_info=True)
+            logging.error("An unexpected error occurred while fetching data for %s: %s", ticker_symbol, e, exc_info=True)
             raise DataFetchError(symbol=ticker_symbol) from e
+
+    def fetch_many_ohlcv(self, ticker_symbols: List[str], start_date: str, end_date: str) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """
+        Fetches historical OHLCV data for several ticker symbols concurrently, together with the
+        S&P 500 index. Each symbol goes through the file cache, so only uncached ranges hit Yahoo.
+
+        :param ticker_symbols: The stock ticker symbols (e.g., ['AAPL', 'MSFT']).
+        :param start_date: The start date in 'YYYY-MM-DD' format.
+        :param end_date: The end date in 'YYYY-MM-DD' format.
+        :return: A tuple (sp500_data, {symbol: stock_data}); symbols without data are left out of the dict.
+        :raises DataFetchError: If there is a network error or an issue fetching S&P 500 data.
+        """
+        symbols = list(dict.fromkeys(symbol for symbol in map(str.upper, ticker_symbols) if _TICKER_RE.fullmatch(symbol)))
+        try:
+            sp500_future = self._submit_sp500(start_date, end_date)
+            stocks_data = {}
+            for symbol, stock_data in zip(symbols, self.batch_executor.map(lambda symbol: self._download_or_none(symbol, start_date, end_date), symbols)):
+                if not YahooFinanceClient._is_empty(stock_data):
+                    stocks_data[symbol] = YahooFinanceClient._name_date_index(stock_data)
+            missing = [symbol for symbol in symbols if symbol not in stocks_data]
+            if missing:
+                logging.warning("No data found for %s in the specified date range.", ", ".join(missing))
+            return sp500_future.result(), stocks_data
+        except DataFetchError:
+            raise
+        except Exception as e:
+            logging.error("An unexpected error occurred while fetching data for %d symbols: %s", len(symbols), e, exc_info=True)
+            raise DataFetchError(symbol=", ".join(symbols)) from e
+
+# Shared by every PredictionService in the process, so the executors and the file cache's in-memory
+# frames are reused across requests instead of rebuilt per client.
+default_client = YahooFinanceClient()
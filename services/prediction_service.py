@@ -1,67 +1,122 @@
 import logging
+import math
 from datetime import date, timedelta
 
 import numpy as np
 import pandas as pd
+from numba import njit, types
 
 from services.model import ForecastResult
 
-from outward_services.yahoo_finance_client import YahooFinanceClient
+from outward_services.yahoo_finance_client import YahooFinanceClient, default_client
+
+# Prices are stored as float32 for the forecast and confidence kernels; the heuristics do not need
+# float64 input precision. The kernels still accumulate sums and ratios in float64.
+PRICE_DTYPE = np.float32
+
+# The kernels are compiled eagerly for these signatures when the module is imported (or loaded from
+# Numba's on-disk cache), so no request pays the JIT cost. Read-only, any-layout arrays accept
+# writable arrays, the read-only views pandas hands out from to_numpy() and strided slices alike.
+_PRICES = types.Array(types.float32, 1, 'A', readonly=True)
+
+
+@njit(types.float64(_PRICES, types.int64, types.int64), cache=True)
+def _ma_terminal(prices: np.ndarray, window: int, steps: int) -> float:
+    """Final price of the recursive MA forecast, keeping only the last `window` prices in a ring buffer."""
+    n = prices.shape[0]
+    if n < window:
+        raise ValueError("insufficient window length for forecasting")
+    ring = np.empty(window, dtype=np.float64)
+    ring[:] = prices[n - window:]
+    running_sum = ring.sum()
+    next_price = float(prices[n - 1])
+    for step in range(steps):
+        next_price = running_sum / window
+        # ring[slot] holds the oldest price in the window; overwrite it with the newest.
+        slot = step % window
+        running_sum += next_price - ring[slot]
+        ring[slot] = next_price
+    return next_price
+
+
+@njit(types.float64(_PRICES, types.int64, types.int64), cache=True)
+def _ma_forecast(prices: np.ndarray, window: int, steps: int) -> float:
+    """Cumulative return from the last known price to the end of the recursive MA forecast."""
+    if steps <= 0:
+        return 0.0
+    return (_ma_terminal(prices, window, steps) / prices[-1]) - 1.0
+
+
+# numpy error model: a zero price yields inf/nan (filtered below) instead of raising ZeroDivisionError.
+@njit(types.float64(_PRICES, _PRICES, types.float64, types.int64, types.int64), cache=True, error_model='numpy')
+def _confidence(stock_close: np.ndarray, index_close: np.ndarray, spread: float, lookback_days: int, horizon_days: int) -> float:
+    """Confidence in [0, 1) from the spread scaled by the recent stock-index return spread volatility."""
+    # The series are aligned on their most recent rows.
+    m = min(stock_close.shape[0], index_close.shape[0])
+    s = stock_close[stock_close.shape[0] - m:]
+    i = index_close[index_close.shape[0] - m:]
+    # One pass over the last `lookback_days` finite daily spread returns (Welford's running variance).
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for t in range(m - 1, 0, -1):
+        if count >= lookback_days:
+            break
+        d = float(s[t]) / float(s[t - 1]) - float(i[t]) / float(i[t - 1])
+        if not math.isfinite(d):
+            continue
+        count += 1
+        delta = d - mean
+        mean += delta / count
+        m2 += delta * (d - mean)
+    std_val = math.sqrt(m2 / (count - 1)) if count > 1 else math.nan
+    # Guard against NaN/inf/zero volatility
+    if not math.isfinite(std_val) or std_val <= 0.0:
+        std_val = 1e-4
+    h = max(horizon_days, 1)
+    z = abs(spread) / (std_val * math.sqrt(h))  # scale with horizon
+    # Map to [0,1] with 0 at neutrality and saturation towards 1 for strong signal
+    return 1.0 - math.exp(-z)
 
 
 class PredictionService:
-    def __init__(self):
-        self.yahoo_finance_client = YahooFinanceClient()
+    def __init__(self, yahoo_finance_client: YahooFinanceClient | None = None):
+        self.yahoo_finance_client = yahoo_finance_client or default_client
         self.number_of_future_trading_days = 5
         self.k = 10  # number of past days to consider when calculating average.
 
     @staticmethod
-    def _roll_forward_forecast(last_known_prices: list[float], window: int, steps: int) -> list[float]:
-        """Recursive MA forecast: each next-day price = mean of last K observations (where after t0 we append our own predictions)."""
-        prices = list(last_known_prices)
-        preds = []
-        for _ in range(steps):
-            if len(prices) < window:
-                raise ValueError("insufficient window length for forecasting")
-            next_price = float(np.mean(prices[-window:]))
-            preds.append(next_price)
-            prices.append(next_price)
-        return preds
-
-
-    @staticmethod
-    def _cumulative_return(current_price: float, future_prices: list[float]) -> float:
-        if not future_prices:
-            return 0.0
-        end_price = future_prices[-1]
-        return (end_price / current_price) - 1.0
-    
-    @staticmethod
-    def _calculate_confidence(s_close, i_close, spread, lookback_days, horizon_days):
+    def _calculate_confidence(s_close: np.ndarray, i_close: np.ndarray, spread: float, lookback_days: int, horizon_days: int) -> float:
         # A simple confidence heuristic: scaled absolute spread by expected volatility proxy.
         # Use recent (K) realized volatility of stock-index spread as a denominator; map via logistic to 0..1.
-        spread_hist = (s_close.pct_change() - i_close.pct_change()).dropna().tail(lookback_days)
-        std_val = float(spread_hist.std())
-        # Guard against NaN/inf/zero volatility
-        if not np.isfinite(std_val) or std_val <= 0.0:
-            std_val = 1e-4
-        h = max(int(horizon_days), 1)
-        z = float(abs(spread) / (std_val * np.sqrt(h)))  # scale with horizon
-        # Map to [0,1] with 0 at neutrality and saturation towards 1 for strong signal
-        confidence = float(1.0 - np.exp(-z))
-        return confidence    
+        s = np.asarray(s_close, dtype=PRICE_DTYPE)
+        i = np.asarray(i_close, dtype=PRICE_DTYPE)
+        return float(_confidence(s, i, float(spread), int(lookback_days), int(horizon_days)))
+
     @staticmethod
-    def _calculate_future_prediction(stock_close: pd.Series, sp500_close: pd.Series, lookback_days: int, horizon_days: int):
-        stock_latest_close_value = float(stock_close.iloc[-1])
-        sp500_latest_close_value = float(sp500_close.iloc[-1])
+    def _until(data: pd.DataFrame, requested_date: date) -> pd.DataFrame:
+        """Rows dated on or before `requested_date`, located by binary search on the sorted index."""
+        cutoff = pd.Timestamp(requested_date + timedelta(days=1), tz=data.index.tz)
+        return data.iloc[:data.index.searchsorted(cutoff, side='left')]
 
-        stock_pred_path = PredictionService._roll_forward_forecast(stock_close.tolist(), window=lookback_days, steps=horizon_days)
-        sp500_pred_path = PredictionService._roll_forward_forecast(sp500_close.tolist(), window=lookback_days, steps=horizon_days)
+    @staticmethod
+    def _align(stock_data: pd.DataFrame, sp500_data: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Rows of both frames on their common trading days, so the kernels can pair prices by position."""
+        # Same calendar (the usual case for US stocks): equals() is an O(n) value comparison, with no copies.
+        if stock_data.index.equals(sp500_data.index):
+            return stock_data, sp500_data
+        # Compare calendar days, so a stock listed in another time zone still lines up with the index.
+        stock_days = stock_data.index.tz_localize(None)
+        sp500_days = sp500_data.index.tz_localize(None)
+        common_days = stock_days.intersection(sp500_days)
+        return stock_data.iloc[stock_days.get_indexer(common_days)], sp500_data.iloc[sp500_days.get_indexer(common_days)]
 
-        stock_cumulative = PredictionService._cumulative_return(stock_latest_close_value, stock_pred_path)
-        sp500_cumulative = PredictionService._cumulative_return(sp500_latest_close_value, sp500_pred_path)
+    @staticmethod
+    def _calculate_future_prediction(stock_close: np.ndarray, sp500_close: np.ndarray, lookback_days: int, horizon_days: int):
+        stock_cumulative = _ma_forecast(np.asarray(stock_close, dtype=PRICE_DTYPE), lookback_days, horizon_days)
+        sp500_cumulative = _ma_forecast(np.asarray(sp500_close, dtype=PRICE_DTYPE), lookback_days, horizon_days)
 
-        return stock_cumulative, sp500_cumulative
+        return float(stock_cumulative), float(sp500_cumulative)
 
 
     def predict(self, symbol: str, requested_date: date, lookback_days: int | None = None, horizon_days: int | None = None) -> ForecastResult:
@@ -74,41 +129,86 @@ class PredictionService:
         :param horizon_days: The number of future trading days to forecast.
         :return: A ForecastResult object with the prediction result and confidence score.
         """       
-        logging.info(f"Generating prediction for {symbol} on {requested_date.isoformat()}.")
+        logging.info("Generating prediction for %s on %s.", symbol, requested_date)
         lookback_days = lookback_days or self.k
         horizon_days = horizon_days or self.number_of_future_trading_days
-        # To ensure we get enough trading days, fetch a larger window of calendar days.
-        start_date = requested_date - timedelta(days=lookback_days * 2 + 5)
-        # yfinance `end` parameter is exclusive, so add one day to include the requested date.
-        end_date = requested_date + timedelta(days=1)
+        start_date, end_date = PredictionService._fetch_range(requested_date, lookback_days)
 
-        logging.info(f"Fetching data for {symbol} from {start_date.isoformat()} to {end_date.isoformat()}")    
+        logging.info("Fetching data for %s from %s to %s", symbol, start_date, end_date)
         sp500_data, stock_data = self.yahoo_finance_client.fetch_ohlcv_data(
             ticker_symbol=symbol,
             start_date=start_date.isoformat(),
             end_date=end_date.isoformat()
         )
 
+        return PredictionService._forecast(symbol, stock_data, sp500_data, requested_date, lookback_days, horizon_days)
+
+    def predict_many(self, symbols: list[str], requested_date: date, lookback_days: int | None = None, horizon_days: int | None = None) -> dict[str, ForecastResult]:
+        """
+        Generates predictions for several symbols, fetching their market data in bulk.
+
+        :param symbols: The stock ticker symbols.
+        :param requested_date: The date for the predictions.
+        :param lookback_days: The number of past trading days to consider.
+        :param horizon_days: The number of future trading days to forecast.
+        :return: A ForecastResult per symbol, in request order; symbols without data are omitted.
+        """
+        logging.info("Generating predictions for %d symbols on %s.", len(symbols), requested_date)
+        lookback_days = lookback_days or self.k
+        horizon_days = horizon_days or self.number_of_future_trading_days
+        start_date, end_date = PredictionService._fetch_range(requested_date, lookback_days)
+
+        sp500_data, stocks_data = self.yahoo_finance_client.fetch_many_ohlcv(
+            ticker_symbols=symbols,
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat()
+        )
+
+        return {
+            symbol: PredictionService._forecast(symbol, stocks_data[symbol], sp500_data, requested_date, lookback_days, horizon_days)
+            for symbol in symbols if symbol in stocks_data
+        }
+
+    @staticmethod
+    def _fetch_range(requested_date: date, lookback_days: int) -> tuple[date, date]:
+        # To ensure we get enough trading days, fetch a larger window of calendar days.
+        start_date = requested_date - timedelta(days=lookback_days * 2 + 5)
+        # yfinance `end` parameter is exclusive, so add one day to include the requested date.
+        end_date = requested_date + timedelta(days=1)
+        return start_date, end_date
+
+    @staticmethod
+    def _forecast(symbol: str, stock_data: pd.DataFrame, sp500_data: pd.DataFrame, requested_date: date, lookback_days: int, horizon_days: int) -> ForecastResult:
+        # yfinance returns rows in chronological order; only sort if that ever stops holding.
+        if not stock_data.index.is_monotonic_increasing:
+            stock_data = stock_data.sort_index()
+        if not sp500_data.index.is_monotonic_increasing:
+            sp500_data = sp500_data.sort_index()
 
         # Filter data to be on or before the requested date, as yfinance might return more.
-        stock_data = stock_data[stock_data.index.date <= requested_date]
-        sp500_data = sp500_data[sp500_data.index.date <= requested_date]
+        stock_data = PredictionService._until(stock_data, requested_date)
+        sp500_data = PredictionService._until(sp500_data, requested_date)
+        # A stock that skipped a day (e.g. a trading halt) would otherwise shift every return it is paired with.
+        stock_data, sp500_data = PredictionService._align(stock_data, sp500_data)
 
         if len(stock_data) < lookback_days:
-            logging.warning(f"Not enough historical data for {symbol}. Found {len(stock_data)} days, need {lookback_days}.")
+            logging.warning("Not enough historical data for %s. Found %d days, need %d.", symbol, len(stock_data), lookback_days)
             return ForecastResult(prediction=False, confidence=0.0)
 
-        last_k_days_data = stock_data.sort_index().tail(lookback_days)
-        last_k_days_sp500 = sp500_data.sort_index().tail(lookback_days)
-        
-        stock_close = last_k_days_data["Close"]
-        sp500_close = last_k_days_sp500["Close"]
+        # Take the last K closes once; the forecast and the confidence both work on these float32 arrays.
+        stock_close = stock_data["Close"].to_numpy()[-lookback_days:].astype(PRICE_DTYPE, copy=False)
+        sp500_close = sp500_data["Close"].to_numpy()[-lookback_days:].astype(PRICE_DTYPE, copy=False)
 
         stock_cumulative, sp500_cumulative = PredictionService._calculate_future_prediction(stock_close, sp500_close, lookback_days, horizon_days)
 
         spread = stock_cumulative - sp500_cumulative
+        if not math.isfinite(spread):
+            # A missing close inside the window leaves no forecast; report no signal rather than NaN,
+            # which PredictionResponse (built without validation) would serialize as null.
+            logging.warning("Missing prices for %s in the last %d days; no forecast.", symbol, lookback_days)
+            return ForecastResult(prediction=False, confidence=0.0)
         outperform = spread > 0
-        confidence_score = self._calculate_confidence(stock_close, sp500_close, spread, lookback_days, horizon_days)
+        confidence_score = PredictionService._calculate_confidence(stock_close, sp500_close, spread, lookback_days, horizon_days)
 
         return ForecastResult(
             prediction=outperform,
@@ -1,6 +1,41 @@
 import os
 import sys
 
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
 # Add the project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+
+MOCK_OHLCV_PATH = os.path.join(project_root, "tests", "fixtures", "mock_ohlcv.parquet")
+
+@pytest.fixture(scope="session")
+def mock_market_data() -> pd.DataFrame:
+    """
+    Load the canonical OHLCV fixture once per test session.
+    Columns are (ticker, price) pairs like a grouped yfinance download, for 'AAPL' and '^GSPC'.
+    Tests must treat the frame as read-only since it is shared.
+    """
+    return pd.read_parquet(MOCK_OHLCV_PATH, memory_map=True)
+
+@pytest.fixture
+def mock_yahoo_client(mock_market_data):
+    """
+    Create a YahooFinanceClient whose downloads are served from the OHLCV fixture, with an empty S&P 500 cache.
+    '^GSPC' gets the index rows, 'BOOM' raises, 'NOPE' has no data and any other symbol gets the AAPL rows.
+    The patched download is available as `client._download` for call assertions.
+    """
+    from outward_services import yahoo_finance_client
+
+    def download(symbol, start_date, end_date):
+        if symbol == "BOOM":
+            raise RuntimeError("boom")
+        if symbol == "NOPE":
+            return None
+        return mock_market_data["^GSPC" if symbol == "^GSPC" else "AAPL"]
+
+    client = yahoo_finance_client.YahooFinanceClient()
+    with patch.object(client, "_download", side_effect=download), patch.dict(yahoo_finance_client._SP500_CACHE, clear=True):
+        yield client
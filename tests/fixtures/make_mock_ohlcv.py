@@ -0,0 +1,36 @@
+"""
+Regenerates mock_ohlcv.parquet, the deterministic OHLCV fixture loaded by the `mock_market_data` fixture:
+
+    python tests/fixtures/make_mock_ohlcv.py
+
+Business days from 2025-01-02 to 2025-03-14 for 'AAPL' and '^GSPC', as seeded random walks. The frame
+matches what the Yahoo client returns: a tz-aware 'Date' index, float32 prices and int64 volumes,
+grouped under (ticker, price) columns.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_ohlcv.parquet")
+
+
+def make_mock_ohlcv() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2025-01-02", "2025-03-15", freq="B", tz="America/New_York", name="Date")
+    frames = {}
+    # (symbol, first close, daily volatility, typical volume)
+    for symbol, start, volatility, volume in (("AAPL", 240.0, 0.015, 5e7), ("^GSPC", 5900.0, 0.008, 4e9)):
+        close = start * np.cumprod(1 + rng.normal(0, volatility, len(index)))
+        open_ = close * (1 + rng.normal(0, volatility / 3, len(index)))
+        high = np.maximum(open_, close) * (1 + abs(rng.normal(0, volatility / 3, len(index))))
+        low = np.minimum(open_, close) * (1 - abs(rng.normal(0, volatility / 3, len(index))))
+        frames[symbol] = pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close}, index=index).round(2).astype("float32")
+        frames[symbol]["Volume"] = rng.integers(volume * 0.5, volume * 1.5, len(index))
+    return pd.concat(frames, axis=1, names=["Ticker", "Price"])
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_PATH
+    make_mock_ohlcv().to_parquet(path, compression="zstd")
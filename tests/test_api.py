@@ -1,11 +1,12 @@
 import pytest
 from datetime import date
 from typing import Generator
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 from flask.testing import FlaskClient
 from api.models import PredictionRequest, PredictionResponse
 from services.model import ForecastResult
+from services.prediction_service import PredictionService
 from app import app
 
 @pytest.fixture
@@ -26,13 +27,11 @@ def valid_request_data():
 @pytest.fixture
 def mock_prediction_service():
     """Create a mock PredictionService for testing."""
-    with patch('app.PredictionService') as mock_service:
-        service_instance = Mock()
-        service_instance.predict.return_value = ForecastResult(
+    with patch('app.prediction_service') as mock_service:
+        mock_service.predict.return_value = ForecastResult(
             prediction=True,
             confidence=0.75
         )
-        mock_service.return_value = service_instance
         yield mock_service
 
 def test_predict_endpoint_success(client, valid_request_data, mock_prediction_service):
@@ -63,7 +62,8 @@ def test_predict_endpoint_invalid_date(client, valid_request_data):
     
     assert response.status_code == 400
     data = response.get_json()
-    assert 'validation_error' in data
+    assert data['error'] == 'Invalid request body'
+    assert data['details'][0]['loc'] == ['date']
 
 def test_predict_endpoint_missing_fields(client):
     """Test prediction request with missing required fields."""
@@ -80,6 +80,7 @@ def test_models():
     )
     assert request.symbol == "AAPL"
     assert isinstance(request.date, date)
+    assert PredictionRequest(symbol="aapl", date=date.today()).symbol == "AAPL"
     
     # Test valid PredictionResponse
     response = PredictionResponse(
@@ -92,3 +93,33 @@ def test_models():
     assert isinstance(response.date, date)
     assert response.prediction is True
     assert response.confidence == 0.75
+
+def test_predict_batch_endpoint(client, mock_prediction_service):
+    """Test batch prediction request with one symbol that has no data."""
+    mock_prediction_service.predict_many.return_value = {
+        "AAPL": ForecastResult(prediction=True, confidence=0.75)
+    }
+    response = client.post('/predict_batch', json={"symbols": ["aapl", "NOPE"], "date": date.today().isoformat()})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['symbol'] for p in data['predictions']] == ["AAPL"]
+    assert data['predictions'][0]['confidence'] == 0.75
+    assert data['not_found'] == ["NOPE"]
+    mock_prediction_service.predict_many.assert_called_once_with(["AAPL", "NOPE"], date.today())
+
+def test_predict_batch_endpoint_empty_symbols(client):
+    """Test batch prediction request without symbols."""
+    response = client.post('/predict_batch', json={"symbols": [], "date": date.today().isoformat()})
+
+    assert response.status_code == 400
+
+def test_predict_batch_endpoint_reports_failed_symbols(client, mock_yahoo_client):
+    """Test that symbols that fail to download, have no data or are malformed are reported in not_found."""
+    with patch('app.prediction_service', PredictionService(mock_yahoo_client)):
+        response = client.post('/predict_batch', json={"symbols": ["msft", "BOOM", "NOPE", "BAD SYMBOL", "AAPL"], "date": "2025-03-07"})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['symbol'] for p in data['predictions']] == ["MSFT", "AAPL"]
+    assert data['not_found'] == ["BOOM", "NOPE", "BAD SYMBOL"]
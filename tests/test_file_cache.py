@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from outward_services.file_cache import FileCache
+
+
+def _ohlcv(start: str, end: str) -> pd.DataFrame:
+    index = pd.date_range(start, end, freq="B", inclusive="left", name="Date")
+    return pd.DataFrame({"Close": range(len(index))}, index=index, dtype="float64")
+
+@pytest.fixture
+def fetch():
+    """Create a fetch callable that returns business-day rows for the requested range."""
+    return Mock(side_effect=_ohlcv)
+
+def test_warm_range_is_served_from_cache(tmp_path, fetch):
+    """Test that a range inside the cached one does not fetch again, even from a new process."""
+    FileCache(tmp_path).get_or_fetch("AAPL", "2025-01-01", "2025-02-01", fetch)
+
+    data = FileCache(tmp_path).get_or_fetch("AAPL", "2025-01-06", "2025-01-11", fetch)
+
+    assert fetch.call_count == 1
+    assert list(data.index.strftime("%Y-%m-%d")) == ["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09", "2025-01-10"]
+
+def test_only_missing_tail_is_fetched(tmp_path, fetch):
+    """Test that extending the range past the cached one only downloads the missing rows."""
+    cache = FileCache(tmp_path)
+    cache.get_or_fetch("AAPL", "2025-01-01", "2025-02-01", fetch)
+
+    data = cache.get_or_fetch("AAPL", "2025-01-15", "2025-02-15", fetch)
+
+    assert fetch.call_args.args == ("2025-02-01", "2025-02-15")
+    assert data.index[0] == pd.Timestamp("2025-01-15")
+    assert data.index[-1] == pd.Timestamp("2025-02-14")
+
+def test_empty_fetch_is_not_cached(tmp_path):
+    """Test that a range with no data is fetched again instead of being cached."""
+    fetch = Mock(return_value=None)
+    cache = FileCache(tmp_path)
+
+    assert cache.get_or_fetch("BAD", "2025-01-01", "2025-02-01", fetch) is None
+    assert cache.get_or_fetch("BAD", "2025-01-01", "2025-02-01", fetch) is None
+    assert fetch.call_count == 2
+
+def test_todays_row_is_refetched_after_ttl(tmp_path, fetch):
+    """Test that a range reaching today is served from cache within the TTL and refreshed after it."""
+    today, tomorrow = date.today(), date.today() + timedelta(days=1)
+    start = (today - timedelta(days=30)).isoformat()
+    cache = FileCache(tmp_path, today_ttl=60.0)
+    cache.get_or_fetch("AAPL", start, tomorrow.isoformat(), fetch)
+
+    cache.get_or_fetch("AAPL", start, tomorrow.isoformat(), fetch)
+    assert fetch.call_count == 1
+
+    cache._frames["AAPL"].fetched_at -= 61
+    cache.get_or_fetch("AAPL", start, tomorrow.isoformat(), fetch)
+    assert fetch.call_args.args == (today.isoformat(), tomorrow.isoformat())
+
+def test_partial_day_is_refetched_after_midnight(tmp_path, fetch):
+    """Test that the row of the day a range was fetched on is fetched again on the next day."""
+    today, yesterday = date.today(), date.today() - timedelta(days=1)
+    start = (today - timedelta(days=30)).isoformat()
+    cache = FileCache(tmp_path)
+    cache.get_or_fetch("AAPL", start, today.isoformat(), fetch)
+    # As if the range had been fetched mid-session yesterday.
+    cache._frames["AAPL"].fetched_at -= 24 * 60 * 60
+
+    cache.get_or_fetch("AAPL", start, today.isoformat(), fetch)
+
+    assert fetch.call_count == 2
+    assert fetch.call_args.args == (yesterday.isoformat(), today.isoformat())
+
+def test_closed_non_trading_tail_is_cached(tmp_path, fetch):
+    """Test that extending a cached range by a weekend is fetched once and then served from cache."""
+    cache = FileCache(tmp_path)
+    cache.get_or_fetch("AAPL", "2025-02-10", "2025-03-08", fetch)
+
+    for _ in range(3):
+        data = cache.get_or_fetch("AAPL", "2025-02-11", "2025-03-09", fetch)
+
+    assert fetch.call_count == 2
+    assert fetch.call_args.args == ("2025-03-08", "2025-03-09")
+    assert data.index[-1] == pd.Timestamp("2025-03-07")
+
+def test_in_memory_frames_are_bounded(tmp_path, fetch):
+    """Test that only the most recent tickers stay in memory, and evicted ones are read back from disk."""
+    cache = FileCache(tmp_path, max_frames=2)
+    for ticker in ("AAPL", "MSFT", "IBM"):
+        cache.get_or_fetch(ticker, "2025-01-01", "2025-02-01", fetch)
+
+    assert list(cache._frames) == ["MSFT", "IBM"]
+    assert len(cache.get_or_fetch("AAPL", "2025-01-06", "2025-01-11", fetch)) == 5
+    assert fetch.call_count == 3
@@ -0,0 +1,154 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from services.prediction_service import PRICE_DTYPE, PredictionService, _ma_terminal
+
+
+def _reference_terminal(prices, window: int, steps: int) -> float:
+    """Final price of the recursive moving-average forecast, computed directly with np.mean over a growing list."""
+    extended = [float(price) for price in prices]
+    for _ in range(steps):
+        extended.append(float(np.mean(extended[-window:])))
+    return extended[-1]
+
+def test_ma_terminal():
+    """Test the ring-buffer MA forecast's final price against a direct computation, past one full window."""
+    prices = [100.0, 101.5, 99.0, 102.0, 103.5, 104.0, 102.5, 105.0, 106.0, 107.5, 108.0, 106.5]
+    window, steps = 10, 25
+
+    terminal = _ma_terminal(np.asarray(prices, dtype=PRICE_DTYPE), window, steps)
+
+    assert terminal == pytest.approx(_reference_terminal(prices, window, steps))
+
+def test_ma_terminal_insufficient_window():
+    """Test that forecasting with fewer prices than the window raises an error."""
+    with pytest.raises(ValueError):
+        _ma_terminal(np.asarray([100.0, 101.0], dtype=PRICE_DTYPE), 10, 5)
+
+def test_calculate_future_prediction():
+    """Test that the compiled forecast matches the reference forecast and cumulative return."""
+    stock = pd.Series([100.0, 101.5, 99.0, 102.0, 103.5, 104.0, 102.5, 105.0, 106.0, 107.5])
+    sp500 = pd.Series([4000.0, 4010.0, 3990.0, 4020.0, 4035.0, 4030.0, 4050.0, 4060.0, 4045.0, 4070.0])
+
+    stock_cumulative, sp500_cumulative = PredictionService._calculate_future_prediction(stock, sp500, lookback_days=10, horizon_days=5)
+
+    expected_stock = _reference_terminal(stock, 10, 5) / stock.iloc[-1] - 1.0
+    expected_sp500 = _reference_terminal(sp500, 10, 5) / sp500.iloc[-1] - 1.0
+    assert stock_cumulative == pytest.approx(expected_stock)
+    assert sp500_cumulative == pytest.approx(expected_sp500)
+
+def test_calculate_confidence():
+    """Test the confidence heuristic against the pandas formulation."""
+    stock = pd.Series([100.0, 101.5, 99.0, 102.0, 103.5, 104.0, 102.5, 105.0, 106.0, 107.5])
+    sp500 = pd.Series([4000.0, 4010.0, 3990.0, 4020.0, 4035.0, 4030.0, 4050.0, 4060.0, 4045.0, 4070.0])
+    spread = 0.02
+
+    spread_hist = (stock.pct_change() - sp500.pct_change()).dropna().tail(10)
+    expected = 1.0 - np.exp(-abs(spread) / (spread_hist.std() * np.sqrt(5)))
+
+    confidence = PredictionService._calculate_confidence(stock, sp500, spread, lookback_days=10, horizon_days=5)
+
+    assert confidence == pytest.approx(expected)
+    assert 0.0 <= confidence <= 1.0
+
+def test_calculate_confidence_skips_missing_prices():
+    """Test that returns touching a missing price are dropped, as pandas dropna() would."""
+    stock = pd.Series([100.0, 101.5, np.nan, 102.0, 103.5, 104.0, 102.5, 105.0, 106.0, 107.5])
+    sp500 = pd.Series([4000.0, 4010.0, 3990.0, 4020.0, 4035.0, 4030.0, 4050.0, 4060.0, 4045.0, 4070.0])
+    spread = -0.01
+
+    spread_hist = (stock.pct_change(fill_method=None) - sp500.pct_change()).dropna().tail(10)
+    expected = 1.0 - np.exp(-abs(spread) / (spread_hist.std() * np.sqrt(5)))
+
+    confidence = PredictionService._calculate_confidence(stock, sp500, spread, lookback_days=10, horizon_days=5)
+
+    assert confidence == pytest.approx(expected, rel=1e-5)
+
+def test_calculate_confidence_zero_volatility():
+    """Test that a flat spread falls back to the minimum volatility instead of dividing by zero."""
+    prices = np.full(10, 100.0)
+
+    confidence = PredictionService._calculate_confidence(prices, prices, 0.0, lookback_days=10, horizon_days=5)
+
+    assert confidence == 0.0
+
+def test_calculate_future_prediction_long_horizon():
+    """Test the terminal-only forecast when the horizon is longer than the window."""
+    prices = np.array([100.0, 101.5, 99.0, 102.0, 103.5, 104.0])
+
+    stock_cumulative, _ = PredictionService._calculate_future_prediction(prices, prices, lookback_days=3, horizon_days=25)
+
+    expected = _reference_terminal(prices, 3, 25) / prices[-1] - 1.0
+    assert stock_cumulative == pytest.approx(expected)
+
+def test_until():
+    """Test that only rows dated on or before the requested date are kept."""
+    index = pd.date_range("2025-01-06", periods=5, freq="D", name="Date")
+    data = pd.DataFrame({"Close": [1.0, 2.0, 3.0, 4.0, 5.0]}, index=index)
+
+    filtered = PredictionService._until(data, date(2025, 1, 8))
+
+    assert filtered["Close"].tolist() == [1.0, 2.0, 3.0]
+
+def test_float32_confidence_matches_float64():
+    """Test that running the forecast and confidence on float32 prices stays within 1e-5 of float64."""
+    rng = np.random.default_rng(42)
+    stock = 150.0 * np.cumprod(1.0 + rng.normal(0.0, 0.015, 10))
+    sp500 = 4500.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, 10))
+
+    stock_cumulative, sp500_cumulative = PredictionService._calculate_future_prediction(stock, sp500, lookback_days=10, horizon_days=5)
+    spread = stock_cumulative - sp500_cumulative
+    confidence = PredictionService._calculate_confidence(stock, sp500, spread, lookback_days=10, horizon_days=5)
+
+    expected_spread = (_reference_terminal(stock, 10, 5) / stock[-1]) - (_reference_terminal(sp500, 10, 5) / sp500[-1])
+    spread_hist = np.diff(stock) / stock[:-1] - np.diff(sp500) / sp500[:-1]
+    expected = 1.0 - np.exp(-abs(expected_spread) / (spread_hist.std(ddof=1) * np.sqrt(5)))
+
+    assert abs(confidence - expected) < 1e-5
+
+def test_predict_with_fixture_data(mock_market_data):
+    """Test an end-to-end prediction on the recorded OHLCV fixture."""
+    service = PredictionService()
+    stock_data, sp500_data = mock_market_data["AAPL"], mock_market_data["^GSPC"]
+    requested_date = date(2025, 3, 7)
+
+    with patch.object(service, "yahoo_finance_client") as mock_client:
+        mock_client.fetch_ohlcv_data.return_value = (sp500_data, stock_data)
+        result = service.predict("AAPL", requested_date)
+
+    # Pinned from a float64 pandas/np.mean computation over the fixture's last 10 closes up to 2025-03-07:
+    # AAPL is forecast to trail the S&P 500 by ~0.67% over 5 days.
+    assert result.prediction is False
+    assert result.confidence == pytest.approx(0.152915, rel=1e-4)
+
+def test_align_drops_days_missing_from_either_series(mock_market_data):
+    """Test that the stock and index rows are paired by trading day, not by position."""
+    stock_data = mock_market_data["AAPL"].drop(index=mock_market_data.index[-3])
+    sp500_data = mock_market_data["^GSPC"].tz_localize(None).tz_localize("Asia/Tokyo")
+
+    aligned_stock, aligned_sp500 = PredictionService._align(stock_data, sp500_data)
+
+    assert len(aligned_stock) == len(aligned_sp500) == len(mock_market_data) - 1
+    assert (aligned_stock.index.tz_localize(None) == aligned_sp500.index.tz_localize(None)).all()
+
+def test_predict_many_keeps_request_order(mock_yahoo_client):
+    """Test that bulk predictions come back in request order, leaving out symbols without data."""
+    service = PredictionService(mock_yahoo_client)
+
+    results = service.predict_many(["MSFT", "BOOM", "AAPL", "NOPE", "IBM"], date(2025, 3, 7))
+
+    assert list(results) == ["MSFT", "AAPL", "IBM"]
+
+def test_forecast_with_missing_close_has_no_signal(mock_market_data):
+    """Test that a missing close in the window yields no signal instead of a NaN confidence."""
+    stock_data = mock_market_data["AAPL"].copy()
+    stock_data.loc[stock_data.index[-3], "Close"] = np.nan
+
+    result = PredictionService._forecast("AAPL", stock_data, mock_market_data["^GSPC"], date(2025, 3, 14), lookback_days=10, horizon_days=5)
+
+    assert result.prediction is False
+    assert result.confidence == 0.0
@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from unittest.mock import patch
+
+from outward_services import yahoo_finance_client
+from outward_services.exceptions import TickerNotFoundError
+from outward_services.yahoo_finance_client import YahooFinanceClient
+
+
+@pytest.fixture(autouse=True)
+def empty_sp500_cache():
+    """Start every test with an empty process-wide S&P 500 cache."""
+    with patch.dict(yahoo_finance_client._SP500_CACHE, clear=True):
+        yield
+
+@pytest.mark.parametrize("symbol", ["", "   ", "AAPL MSFT", "AAPL\n", "$AAPL", "A" * 20])
+def test_malformed_symbol_fails_before_network(symbol):
+    """Test that a malformed symbol is rejected without calling Yahoo Finance."""
+    client = YahooFinanceClient()
+
+    with patch("outward_services.yahoo_finance_client.yf.Ticker") as mock_ticker:
+        with pytest.raises(TickerNotFoundError):
+            client.fetch_ohlcv_data(symbol, "2025-01-01", "2025-02-01")
+
+    mock_ticker.assert_not_called()
+
+def test_sp500_range_reaching_fetch_day_expires(mock_market_data):
+    """Test that an S&P 500 entry ending after the day it was fetched on expires after the TTL, even the next day."""
+    client = YahooFinanceClient()
+    start, end = "2025-01-01", (date.today() + timedelta(days=1)).isoformat()
+
+    with patch.object(client, "_download", return_value=mock_market_data["^GSPC"]) as mock_download:
+        client._fetch_sp500(start, end)
+        client._fetch_sp500(start, end)
+        assert mock_download.call_count == 1
+
+        # As if the range had been fetched mid-session yesterday.
+        fetched_at, _, sp500_data = yahoo_finance_client._SP500_CACHE[(start, end)]
+        yahoo_finance_client._SP500_CACHE[(start, end)] = (fetched_at - 24 * 60 * 60, date.today() - timedelta(days=1), sp500_data)
+        client._fetch_sp500(start, end)
+
+    assert mock_download.call_count == 2
+
+def test_closed_sp500_range_never_expires(mock_market_data):
+    """Test that an S&P 500 range that had already closed when fetched stays cached past the TTL."""
+    client = YahooFinanceClient()
+    key = ("2025-01-01", "2025-03-01")
+
+    with patch.object(client, "_download", return_value=mock_market_data["^GSPC"]) as mock_download:
+        client._fetch_sp500(*key)
+        fetched_at, fetched_on, sp500_data = yahoo_finance_client._SP500_CACHE[key]
+        yahoo_finance_client._SP500_CACHE[key] = (fetched_at - 24 * 60 * 60, fetched_on - timedelta(days=1), sp500_data)
+        client._fetch_sp500(*key)
+
+    assert mock_download.call_count == 1
+
+def test_concurrent_sp500_misses_download_once(mock_market_data):
+    """Test that concurrent requests for an uncached S&P 500 range share a single download."""
+    client = YahooFinanceClient()
+
+    def slow_download(symbol, start_date, end_date):
+        time.sleep(0.1)
+        return mock_market_data["^GSPC"]
+
+    with patch.object(client, "_download", side_effect=slow_download) as mock_download:
+        threads = [threading.Thread(target=client._fetch_sp500, args=("2025-01-01", "2025-03-01")) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert mock_download.call_count == 1
+
+def test_cached_sp500_skips_executor(mock_market_data):
+    """Test that a cached S&P 500 range is served on the calling thread, without queuing on the executor."""
+    client = YahooFinanceClient()
+
+    with patch.object(client, "_download", return_value=mock_market_data["^GSPC"]):
+        client._fetch_sp500("2025-01-01", "2025-03-01")
+        with patch.object(client.executor, "submit") as mock_submit:
+            client.fetch_ohlcv_data("AAPL", "2025-01-01", "2025-03-01")
+
+    mock_submit.assert_not_called()
+
+def test_fetch_many_ohlcv(mock_yahoo_client, mock_market_data):
+    """Test that the bulk fetch dedupes and filters symbols, skips failures and keeps request order."""
+    sp500_data, stocks_data = mock_yahoo_client.fetch_many_ohlcv(["msft", "BOOM", "AAPL", "NOPE", "MSFT", "BAD SYMBOL"], "2025-01-01", "2025-03-01")
+
+    assert list(stocks_data) == ["MSFT", "AAPL"]
+    assert sp500_data.equals(mock_market_data["^GSPC"])
+    downloaded = sorted(call.args[0] for call in mock_yahoo_client._download.call_args_list)
+    assert downloaded == ["AAPL", "BOOM", "MSFT", "NOPE", "^GSPC"]
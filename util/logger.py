@@ -1,34 +1,72 @@
+import atexit
 import logging
 import logging.handlers
+import queue
 from pathlib import Path
 
-def setup_logging(level: int = logging.INFO) -> logging.Logger:
-    log_path = "finq_ai.log"
+# Records are queued by the logging threads and written by a single background listener,
+# so request threads never block on file or console I/O.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: logging.handlers.QueueListener | None = None
+# Log files (by resolved path) and console output already fed by the listener, so repeated
+# setup_logging() calls (reloads, debug restarts) return without scanning handlers.
+_CONFIGURED_PATHS: set[str] = set()
+_CONSOLE_ATTACHED = False
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+atexit.register(_stop_listener)
+
+def restart_listener() -> None:
+    """
+    Start a new listener in a forked worker process. The listener thread started in the parent
+    (e.g. under gunicorn's preload_app) does not survive fork, so queued records would never be written.
+    """
+    global _listener
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(_log_queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+def setup_logging(level: int = logging.INFO, log_path: str = "finq_ai.log") -> logging.Logger:
+    """
+    Route the root logger through the background listener, writing to `log_path` and the console.
+    Calling it again with another path adds that file to the listener; the same path is only set up once.
+    """
+    global _listener, _CONSOLE_ATTACHED
+    logger = logging.getLogger()
+    logger.setLevel(level)
+
+    log_key = str(Path(log_path).resolve())
+    if log_key in _CONFIGURED_PATHS:
+        return logger
+    _CONFIGURED_PATHS.add(log_key)
+
     log_dir = Path(log_path).parent
     if log_dir and str(log_dir) != "":
         Path(log_dir).mkdir(parents=True, exist_ok=True)
 
-    logger = logging.getLogger()
-    logger.setLevel(level)
     formatter = logging.Formatter("%(asctime)s:%(name)s:%(levelname)s {%(module)s %(funcName)s}:%(message)s")
+    # Keep the files configured by earlier calls.
+    handlers = list(_listener.handlers) if _listener is not None else []
+
+    file_handler = logging.FileHandler(log_path, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
 
-    # Check for existing file handler for the target logfile
-    file_handler_exists = False
-    for h in logger.handlers:
-        if isinstance(h, logging.FileHandler) and getattr(h, 'baseFilename', None) and Path(h.baseFilename).resolve() == Path(log_path).resolve():
-            file_handler_exists = True
-            break
-
-    if not file_handler_exists:
-        file_handler = logging.FileHandler(log_path, encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
-    # Ensure only one console handler (StreamHandler to sys.stderr or sys.stdout)
-    console_handler_exists = any(isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler) for h in logger.handlers)
-    if not console_handler_exists:
+    # Ensure only one console handler
+    if not _CONSOLE_ATTACHED:
+        _CONSOLE_ATTACHED = True
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    if _listener is None:
+        logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    else:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
 
-    return logger
\ No newline at end of file
+    return logger